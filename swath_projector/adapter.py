@@ -87,9 +87,9 @@ class SwathProjectorAdapter(BaseHarmonyAdapter):
 
             # Stage the output file with a conventional filename
             output_filename = generate_output_filename(asset.href, is_regridded=True)
-            mimetype, _ = mimetypes.guess_type(output_filename, False) or (
-                'application/x-netcdf4',
-                None,
+            mimetype = (
+                mimetypes.guess_type(output_filename, False)[0]
+                or 'application/x-netcdf4'
             )
 
             url = stage(
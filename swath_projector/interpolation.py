@@ -67,36 +67,41 @@ def resample_all_variables(
 
     check_for_valid_interpolation(message_parameters, logger)
 
-    for variable in science_variables:
-        try:
-            variable_output_path = get_variable_file_path(
-                temp_directory, variable, output_extension
-            )
-
-            logger.info(f'Reprojecting variable "{variable}"')
-            logger.info(f'Reprojected output: "{variable_output_path}"')
-
-            resample_variable(
-                message_parameters,
-                variable,
-                reprojection_cache,
-                variable_output_path,
-                logger,
-                var_info,
-            )
-
-            output_variables.append(variable)
-        except Exception as error:
-            # Assume for now variable cannot be reprojected. TBD add checks for
-            # other error conditions.
-            logger.error(f'Cannot reproject {variable}')
-            logger.exception(error)
+    # Open the input granule once, so that its metadata are only read a
+    # single time for all science variables.
+    with Dataset(message_parameters['input_file']) as input_dataset:
+        for variable in science_variables:
+            try:
+                variable_output_path = get_variable_file_path(
+                    temp_directory, variable, output_extension
+                )
+
+                logger.info(f'Reprojecting variable "{variable}"')
+                logger.info(f'Reprojected output: "{variable_output_path}"')
+
+                resample_variable(
+                    message_parameters,
+                    input_dataset,
+                    variable,
+                    reprojection_cache,
+                    variable_output_path,
+                    logger,
+                    var_info,
+                )
+
+                output_variables.append(variable)
+            except Exception as error:
+                # Assume for now variable cannot be reprojected. TBD add checks
+                # for other error conditions.
+                logger.error(f'Cannot reproject {variable}')
+                logger.exception(error)
 
     return output_variables
 
 
 def resample_variable(
     message_parameters: Dict,
+    dataset: Dataset,
     full_variable: str,
     reprojection_cache: Dict,
     variable_output_path: str,
@@ -112,11 +117,13 @@ def resample_variable(
     recalled, rather than re-derived for subsequent science variables that
     share the same coordinate variables.
 
+    The input granule is opened by the caller, and is not closed by this
+    function.
+
     """
     interpolation_functions = get_resampling_functions()[
         message_parameters['interpolation']
     ]
-    dataset = Dataset(message_parameters['input_file'])
     variable = dataset[full_variable]
     # get variable with CF_Overrides and get real coordinates
     variable_cf = var_info.get_variable(full_variable)
@@ -130,16 +137,21 @@ def resample_variable(
     else:
         logger.debug(f'Deriving interpolation information for {full_variable}')
 
+        # Read the coordinate values once, for use in both the target area
+        # and the swath definition.
+        latitudes = get_coordinate_variable(dataset, coordinates_key, 'lat')
+        longitudes = get_coordinate_variable(dataset, coordinates_key, 'lon')
+
         if HARMONY_TARGET in reprojection_cache:
             logger.debug('Using target area defined in Harmony message.')
             target_area = reprojection_cache[HARMONY_TARGET]['target_area']
         else:
             logger.debug('Deriving target area from associated coordinates.')
             target_area = get_target_area(
-                message_parameters, dataset, coordinates_key, logger
+                message_parameters, longitudes, latitudes, coordinates_key, logger
             )
 
-        swath_definition = get_swath_definition(dataset, coordinates_key)
+        swath_definition = get_swath_definition(longitudes, latitudes)
 
         reprojection_information = interpolation_functions['get_information'](
             swath_definition, target_area
@@ -176,8 +188,6 @@ def resample_variable(
         attributes,
     )
 
-    dataset.close()
-
     logger.debug(
         f'Saved {full_variable} output to temporary file: ' f'{variable_output_path}'
     )
@@ -259,7 +269,12 @@ def get_ewa_results(
 
     """
     if np.issubdtype(variable['values'].dtype, np.integer):
-        variable['values'] = variable['values'].astype(float)
+        # Integers of up to 16 bits are exactly representable as float32,
+        # which halves the memory traffic in `fornav` compared to float64.
+        if variable['values'].dtype.itemsize <= 2:
+            variable['values'] = variable['values'].astype(np.float32)
+        else:
+            variable['values'] = variable['values'].astype(np.float64)
 
     # This call falls back on the EWA rows_per_scan default of total input rows
     # and ignores the quality status return value
@@ -377,15 +392,14 @@ def check_for_valid_interpolation(message_parameters: Dict, logger: Logger) -> N
         )
 
 
-def get_swath_definition(dataset: Dataset, coordinates: Tuple[str]) -> SwathDefinition:
-    """Define the swath as specified by the associated longitude and latitude
-    datasets. Note, the longitudes must be wrapped to the range:
-    -180 < longitude < 180.
+def get_swath_definition(
+    longitudes: np.ma.MaskedArray, latitudes: np.ma.MaskedArray
+) -> SwathDefinition:
+    """Define the swath as specified by the values of the associated longitude
+    and latitude variables. Note, the longitudes must be wrapped to the
+    range: -180 < longitude < 180.
 
     """
-    latitudes = get_coordinate_variable(dataset, coordinates, 'lat')
-    longitudes = get_coordinate_variable(dataset, coordinates, 'lon')
-
     wrapped_lons, wrapped_lats = check_and_wrap(longitudes[:], latitudes[:])
 
     # EWA ll2cr requires 2-dimensional arrays for the swath coordinates:
@@ -435,11 +449,16 @@ def get_reprojection_cache(parameters: Dict) -> Dict:
 
 
 def get_target_area(
-    parameters: Dict, dataset: Dataset, coordinates: Tuple[str], logger: Logger
+    parameters: Dict,
+    longitudes: np.ma.MaskedArray,
+    latitudes: np.ma.MaskedArray,
+    coordinates: Tuple[str],
+    logger: Logger,
 ) -> AreaDefinition:
     """Define the target area as specified by either a complete set of message
-    parameters, or supplemented with coordinate variables as referred to in
-    the science variable metadata.
+    parameters, or supplemented with the values of the coordinate variables
+    referred to in the science variable metadata. The names of those
+    coordinate variables are used as the identifier of the target area.
 
     """
     grid_extents = get_parameters_tuple(
@@ -448,8 +467,6 @@ def get_target_area(
     dimensions = get_parameters_tuple(parameters, ['height', 'width'])
     resolutions = get_parameters_tuple(parameters, ['xres', 'yres'])
     projection_string = parameters['projection'].definition_string()
-    latitudes = get_coordinate_variable(dataset, coordinates, 'lat')
-    longitudes = get_coordinate_variable(dataset, coordinates, 'lon')
 
     if grid_extents is not None:
         logger.info(
@@ -85,7 +85,9 @@ def write_single_band_output(
             grid_mapping_name,
             attributes,
         )
-        write_dimension_variables(output_file, dimensions, target_area)
+        write_dimension_variables(
+            output_file, dimensions, target_area, reprojection_cache
+        )
 
 
 def write_dimensions(
@@ -226,7 +228,10 @@ def write_science_variable(
 
 
 def write_dimension_variables(
-    dataset: Dataset, dimensions: Tuple[str], target_area: AreaDefinition
+    dataset: Dataset,
+    dimensions: Tuple[str],
+    target_area: AreaDefinition,
+    cache: Dict,
 ) -> None:
     """Write projected x and y coordinate information to the `netCDF4.Dataset`
     instance, each as a `netCDF4.Variable`. Each dimension variable
@@ -236,8 +241,22 @@ def write_dimension_variables(
     - A reference to itself as a dimension.
     - Metadata that includes the dimension variable's name and units.
 
+    The projected vectors are identical for all science variables that share
+    a target area, so they are saved in the reprojection cache the first
+    time they are calculated, and retrieved from the cache thereafter. A
+    target area defined by the Harmony message is shared by all variables,
+    so its vectors are saved alongside it in the cache.
+
     """
-    x_vector, y_vector = target_area.get_proj_vectors()
+    if target_area.area_id == HARMONY_TARGET:
+        target_area_cache = cache[HARMONY_TARGET]
+    else:
+        target_area_cache = cache[tuple(target_area.area_id.split(', '))]
+
+    if 'projected_vectors' not in target_area_cache:
+        target_area_cache['projected_vectors'] = target_area.get_proj_vectors()
+
+    x_vector, y_vector = target_area_cache['projected_vectors']
     dimension_data = {dimensions[0]: y_vector, dimensions[1]: x_vector}
 
     for dimension_name, dimension_vector in dimension_data.items():
@@ -1,8 +1,8 @@
 """ Data Services Swath Projector service for Harmony """
 
-import functools
 import logging
 import os
+from functools import lru_cache
 from tempfile import mkdtemp
 from typing import Dict
 
@@ -22,6 +22,9 @@ CRS_DEFAULT = '+proj=longlat +ellps=WGS84'
 INTERPOLATION_DEFAULT = 'ewa-nn'
 CF_CONFIG_FILE = 'swath_projector/earthdata_varinfo_config.json'
 
+# A sentinel to distinguish absent attributes from those set to `None`.
+_MISSING = object()
+
 
 def reproject(
     message: Message,
@@ -42,7 +45,7 @@ def reproject(
     # Set up source and destination files
     temp_dir = mkdtemp()
     root_ext = os.path.splitext(os.path.basename(parameters.get('input_file')))
-    output_file = temp_dir + os.sep + root_ext[0] + '_repr' + root_ext[1]
+    output_file = os.path.join(temp_dir, f'{root_ext[0]}_repr{root_ext[1]}')
 
     logger.info(f'Reprojecting file {parameters.get("input_file")} as {output_file}')
     logger.info(
@@ -119,7 +122,7 @@ def get_parameters_from_message(
         'yres': rgetattr(message, 'format.scaleSize.y', None),
     }
 
-    parameters['projection'] = Proj(parameters['crs'])
+    parameters['projection'] = get_projection(parameters['crs'])
 
     if parameters['interpolation'] in [None, '', 'None']:
         parameters['interpolation'] = INTERPOLATION_DEFAULT
@@ -160,24 +163,38 @@ def get_parameters_from_message(
     return parameters
 
 
+@lru_cache(maxsize=32)
+def get_projection(crs: str) -> Proj:
+    """Return a `pyproj.Proj` instance for the requested CRS. Constructing a
+    `Proj` object requires PROJ to parse the CRS, and possibly query its
+    database, so instances are cached for subsequent requests in the same
+    process that specify the same CRS.
+
+    """
+    return Proj(crs)
+
+
 def rgetattr(obj, attr: str, *args):
     """Recursive get attribute. Returns attribute from an attribute hierarchy,
     e.g. a.b.c, if it exists. If it doesn't exist, the default value will
     be assigned. Even though the `args` is often optional, in this case the
     default value *must* be defined.
 
+    The traversal stops at the first absent attribute, returning the default
+    value without attempting to retrieve the remaining attributes from it.
+
     """
+    default = args[0]
+    attribute_value = obj
 
-    # functools.reduce will apply _getattr with previous result (obj)
-    #   and item from sequence (attr)
-    def _getattr(obj, attr):
-        return getattr(obj, attr, *args)
+    for attribute_name in attr.split('.'):
+        attribute_value = getattr(attribute_value, attribute_name, _MISSING)
 
-    # First call takes first two items, thus need [obj] as first item in sequence
-    attribute_value = functools.reduce(_getattr, [obj] + attr.split('.'))
+        if attribute_value is _MISSING:
+            return default
 
     # Check if the message value is `None` but a non-None default was defined
-    if attribute_value is None and args[0] is not None:
-        attribute_value = args[0]
+    if attribute_value is None and default is not None:
+        attribute_value = default
 
     return attribute_value
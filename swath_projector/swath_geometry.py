@@ -183,7 +183,10 @@ def get_perimeter_coordinates(
     unordered_points = row_points.union(column_points)
 
     if swath_crosses_international_date_line(longitudes):
-        # The International Date Line is between two pixel columns.
+        # The International Date Line is between two pixel columns. Adjust a
+        # copy of the longitudes, so the input array is not altered.
+        longitudes = longitudes.copy()
+
         if np.median(longitudes) < 0:
             # Most pixels are in the Western Hemisphere.
             longitudes[longitudes > 0] -= 360.0
@@ -1,4 +1,7 @@
 import os
+import posixpath
+from functools import lru_cache
+from math import isqrt
 from typing import Dict, Optional, Tuple, Union
 
 import numpy as np
@@ -9,6 +12,10 @@ from swath_projector.exceptions import MissingCoordinatesError
 
 FillValueType = Optional[Union[float, int]]
 
+# The target size, in bytes, of each HDF5 chunk in a variable written to an
+# output NetCDF-4 file.
+CHUNK_SIZE_BYTES = 1024 * 1024
+
 
 def create_coordinates_key(variable: VariableFromNetCDF4) -> Tuple[str]:
     """Create a unique, hashable entity from the coordinates
@@ -18,7 +25,7 @@ def create_coordinates_key(variable: VariableFromNetCDF4) -> Tuple[str]:
     attribute with supplements and overrides, where required.
 
     """
-    return tuple(sorted(list(variable.references.get('coordinates'))))
+    return tuple(sorted(variable.references.get('coordinates')))
 
 
 def get_variable_values(
@@ -30,9 +37,11 @@ def get_variable_values(
 
     As the variable data are returned as a `numpy.ma.MaskedArray`, the will
     return no data in the filled pixels. To ensure that the data are
-    correctly handled, the fill value is applied to masked pixels using the
-    `filled` method. The variable values are transposed if the `along-track`
-    dimension size is less than the `across-track` dimension size.
+    correctly handled, the fill value is applied to masked pixels using
+    `fill_masked_values`. The variable values are then transposed if the
+    `along-track` dimension size is less than the `across-track` dimension
+    size. The transposed values are not copied to a C-contiguous array, as
+    all interpolation methods accept a transposed view of the values.
 
     """
     # TODO: Remove in favour of apply2D or process_subdimension.
@@ -40,20 +49,47 @@ def get_variable_values(
     #       in the longitude-latitude plane should be used to determine 2-D
     #       reprojection information. This information should then also be
     #       applied across the other preceding or following dimensions.
-    if len(variable[:].shape) == 1:
+    # The number of dimensions is determined from the variable metadata, so
+    # that the array values are only read from the file once.
+    if variable.ndim == 1:
         return make_array_two_dimensional(variable[:])
     elif 'time' in input_file.variables and 'time' in variable.dimensions:
         # Assumption: Array = (time, along-track, across-track)
-        return transpose_if_xdim_less_than_ydim(variable[0][:]).filled(
-            fill_value=fill_value
+        return transpose_if_xdim_less_than_ydim(
+            fill_masked_values(variable[0], fill_value), copy=False
         )
     else:
         # Assumption: Array = (along-track, across-track)
-        return transpose_if_xdim_less_than_ydim(variable[:]).filled(
-            fill_value=fill_value
+        return transpose_if_xdim_less_than_ydim(
+            fill_masked_values(variable[:], fill_value), copy=False
         )
 
 
+def fill_masked_values(
+    variable_values: np.ma.MaskedArray, fill_value: FillValueType
+) -> np.ndarray:
+    """Return the data of a masked array, with the fill value applied to all
+    masked pixels. If no fill value is specified, the default fill value of
+    the masked array is used, as with `numpy.ma.MaskedArray.filled`.
+
+    Unlike `numpy.ma.MaskedArray.filled`, the fill value is written directly
+    into the underlying data array, rather than into a copy of the full
+    array. This function should therefore only be used for arrays that have
+    just been read from a file, and are not referred to elsewhere.
+
+    """
+    mask = np.ma.getmask(variable_values)
+    values = np.ma.getdata(variable_values)
+
+    if mask is not np.ma.nomask and mask.any():
+        if fill_value is None:
+            fill_value = variable_values.fill_value
+
+        np.copyto(values, fill_value, casting='unsafe', where=mask)
+
+    return values
+
+
 def get_coordinate_variable(
     dataset: Dataset, coordinates_tuple: Tuple[str], coordinate_substring
 ) -> Optional[np.ma.MaskedArray]:
@@ -69,11 +105,13 @@ def get_coordinate_variable(
         if coordinate_substring in coordinate.split('/')[-1] and variable_in_dataset(
             coordinate, dataset
         ):
+            coordinate_values = dataset[coordinate][:]
+
             # QuickFix (DAS-2216) for short and wide swaths
-            if dataset[coordinate].ndim == 1:
-                return dataset[coordinate][:]
+            if coordinate_values.ndim == 1:
+                return coordinate_values
 
-            return transpose_if_xdim_less_than_ydim(dataset[coordinate][:])
+            return transpose_if_xdim_less_than_ydim(coordinate_values)
 
     raise MissingCoordinatesError(coordinates_tuple)
 
@@ -119,7 +157,7 @@ def get_variable_file_path(temp_dir: str, variable_name: str, extension: str) ->
 
     """
     converted_variable_name = variable_name.lstrip('/').replace('/', '_')
-    return os.sep.join([temp_dir, f'{converted_variable_name}{extension}'])
+    return os.path.join(temp_dir, f'{converted_variable_name}{extension}')
 
 
 def get_scale_and_offset(variable: Variable) -> Dict:
@@ -181,19 +219,12 @@ def qualify_reference(raw_reference: str, variable: Variable) -> str:
 def construct_absolute_path(reference: str, referee_group_path: str) -> str:
     """Construct an absolute path for a relative reference to another variable
     (e.g. '../latitude'), by combining the reference with the group path of
-    the referee variable.
+    the referee variable. Any relative components (e.g., '../') are resolved
+    by `posixpath.normpath`, and are never resolved above the root group.
 
     """
-    relative_prefix = '../'
-    group_path_pieces = referee_group_path.split('/')
-
-    while reference.startswith(relative_prefix):
-        reference = reference[len(relative_prefix) :]
-        group_path_pieces.pop()
-
-    absolute_path = '/'.join(group_path_pieces + [reference])
-
-    return f'/{absolute_path.lstrip("/")}'
+    group_path = f'/{referee_group_path.lstrip("/")}'
+    return posixpath.normpath(posixpath.join(group_path, reference))
 
 
 def variable_in_dataset(variable_name: str, dataset: Dataset) -> bool:
@@ -202,21 +233,15 @@ def variable_in_dataset(variable_name: str, dataset: Dataset) -> bool:
     attribute only includes immediate children, not those within nested
     groups.
 
-    """
-    variable_pieces = variable_name.lstrip('/').split('/')
-
-    group = dataset
-    group_valid = True
-
-    while len(variable_pieces) > 1 and group_valid:
-        sub_group = variable_pieces.pop(0)
+    The `netCDF4.Dataset` path lookup is used to traverse the groups, which
+    raises an `IndexError` if any group or the variable itself is absent. A
+    path that refers to a group, rather than a variable, is not matched.
 
-        if sub_group in group.groups:
-            group = group[sub_group]
-        else:
-            group_valid = False
-
-    return group_valid and variable_pieces[-1] in group.variables
+    """
+    try:
+        return isinstance(dataset[variable_name], Variable)
+    except (IndexError, KeyError):
+        return False
 
 
 def make_array_two_dimensional(one_dimensional_array: np.ndarray) -> np.ndarray:
@@ -231,31 +256,71 @@ def make_array_two_dimensional(one_dimensional_array: np.ndarray) -> np.ndarray:
 
 
 def transpose_if_xdim_less_than_ydim(
-    variable_values: np.ma.MaskedArray,
-) -> np.ma.MaskedArray:
+    variable_values: Union[np.ndarray, np.ma.MaskedArray],
+    copy: bool = True,
+) -> Union[np.ndarray, np.ma.MaskedArray]:
     """Return transposed variable when variable is wider than tall.
 
     QuickFix (DAS-2216): We presume that a swath has more rows than columns and
     if that's not the case we transpose it so that it does.
+
+    By default, the transposed array is a C-contiguous copy, of the same type
+    as the input array, as required for coordinates by the `pyresample` EWA
+    `ll2cr` function. A mask is only copied if the input is a masked array.
+    If `copy` is False, a transposed view of the input array is returned.
     """
     if len(variable_values.shape) != 2:
         raise ValueError(
             f'Input variable must be 2 dimensional, but got {len(variable_values.shape)} dimensions.'
         )
     if variable_values.shape[0] < variable_values.shape[1]:
-        return np.ma.transpose(variable_values).copy()
+        if copy:
+            return variable_values.T.copy()
+
+        return variable_values.T
 
     return variable_values
 
 
+@lru_cache(maxsize=128)
 def get_rows_per_scan(total_rows: int) -> int:
     """
     Finds the smallest divisor of the total number of rows. If no divisor is
     found, return the total number of rows.
+
+    Results are cached, as all science variables sharing the same swath
+    will have the same number of rows. Only odd candidate divisors are
+    checked after 2.
     """
     if total_rows < 2:
         return 1
-    for row_number in range(2, int(total_rows**0.5) + 1):
+    if total_rows % 2 == 0:
+        return 2
+    for row_number in range(3, isqrt(total_rows) + 1, 2):
         if total_rows % row_number == 0:
             return row_number
     return total_rows
+
+
+def get_chunk_sizes(shape: Tuple[int], data_type: np.dtype) -> Optional[Tuple[int]]:
+    """Return chunk sizes for a variable with the given shape and data type,
+    aiming for approximately `CHUNK_SIZE_BYTES` per chunk. Chunks span full
+    rows of the fastest varying dimension, with as many rows as fit in the
+    target size. Any leading dimensions (e.g., time) have a chunk size of 1,
+    so that each chunk contains data from a single two-dimensional slice.
+
+    If the variable is a scalar, has a zero-length dimension or a data type
+    without a fixed item size (e.g., variable length strings), `None` is
+    returned, so that the `netCDF4` default chunking is used.
+
+    """
+    if len(shape) == 0 or 0 in shape or not isinstance(data_type, np.dtype):
+        return None
+
+    if len(shape) == 1:
+        return (min(shape[0], max(1, CHUNK_SIZE_BYTES // data_type.itemsize)),)
+
+    row_bytes = data_type.itemsize * shape[-1]
+    chunk_rows = min(shape[-2], max(1, CHUNK_SIZE_BYTES // row_bytes))
+
+    return (1,) * (len(shape) - 2) + (chunk_rows, shape[-1])
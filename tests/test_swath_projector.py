@@ -1,5 +1,5 @@
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 from os import makedirs
 from shutil import copy, rmtree
 from unittest import TestCase
@@ -42,7 +42,6 @@ class TestSwathProjector(TestCase):
     def setUp(self):
         """Set properties of tests that need to be re-created every test."""
         makedirs(self.tmp_dir)
-        copy('tests/data/africa.nc', self.tmp_dir)
 
     def tearDown(self):
         """Perform per-test teardown operations."""
@@ -63,7 +62,9 @@ class TestSwathProjector(TestCase):
     def test_single_band_input(self, mock_download, mock_stage, mock_datetime):
         """Nominal (successful) reprojection of a single band input file."""
         input_file_path = 'tests/data/VNL2_oneBand.nc'
-        mock_datetime.utcnow = Mock(return_value=datetime(2021, 5, 12, 19, 3, 4))
+        mock_datetime.now = Mock(
+            return_value=datetime(2021, 5, 12, 19, 3, 4, tzinfo=timezone.utc)
+        )
         test_data = Message(
             {
                 'accessToken': self.access_token,
@@ -110,7 +111,9 @@ class TestSwathProjector(TestCase):
         """
         input_file_path = 'tests/data/africa.nc'
 
-        mock_datetime.utcnow = Mock(return_value=datetime(2021, 5, 12, 19, 3, 4))
+        mock_datetime.now = Mock(
+            return_value=datetime(2021, 5, 12, 19, 3, 4, tzinfo=timezone.utc)
+        )
         test_data = Message(
             {
                 'accessToken': self.access_token,
@@ -186,6 +189,51 @@ class TestSwathProjector(TestCase):
         self.assertIsNone(history_uppercase)
         self.assertListEqual(json.loads(history_json), expected_history_json)
 
+    def test_netcdf4_extension_mime_type(
+        self, mock_download, mock_stage, mock_datetime
+    ):
+        """Ensure that an output file with an extension that is not known to
+        the `mimetypes` module, such as ".nc4", is staged with the default
+        NetCDF-4 media type, rather than `None`.
+
+        """
+        input_file_path = f'{self.tmp_dir}/africa.nc4'
+        copy('tests/data/africa.nc', input_file_path)
+
+        mock_datetime.now = Mock(
+            return_value=datetime(2021, 5, 12, 19, 3, 4, tzinfo=timezone.utc)
+        )
+        test_data = Message(
+            {
+                'accessToken': self.access_token,
+                'callback': self.callback,
+                'stagingLocation': self.staging_location,
+                'sources': [
+                    {
+                        'granules': [
+                            {
+                                'url': input_file_path,
+                                'temporal': self.temporal,
+                                'bbox': self.bounding_box,
+                            }
+                        ],
+                    }
+                ],
+                'format': {'crs': 'EPSG:4326', 'interpolation': 'near'},
+            }
+        )
+
+        reprojector = SwathProjectorAdapter(test_data, config=config(False))
+        reprojector.invoke()
+
+        mock_stage.assert_called_once_with(
+            StringContains('africa_repr.nc4'),
+            'africa_regridded.nc4',
+            'application/x-netcdf4',
+            location=self.staging_location,
+            logger=ANY,
+        )
+
     def test_africa_input_with_history_and_history_json(
         self, mock_download, mock_stage, mock_datetime
     ):
@@ -215,11 +263,15 @@ class TestSwathProjector(TestCase):
             ]
         )
 
+        copy('tests/data/africa.nc', input_file_path)
+
         with Dataset(input_file_path, 'a') as input_dataset:
             input_dataset.setncattr('history', old_history)
             input_dataset.setncattr('history_json', old_history_json)
 
-        mock_datetime.utcnow = Mock(return_value=datetime(2021, 5, 12, 19, 3, 4))
+        mock_datetime.now = Mock(
+            return_value=datetime(2021, 5, 12, 19, 3, 4, tzinfo=timezone.utc)
+        )
         test_data = Message(
             {
                 'accessToken': self.access_token,
@@ -322,10 +374,14 @@ class TestSwathProjector(TestCase):
         input_file_path = f'{self.tmp_dir}/africa.nc'
         old_history = '2000-01-02T03:04:05.123456+00.00 Swathinator v0.0.1'
 
+        copy('tests/data/africa.nc', input_file_path)
+
         with Dataset(input_file_path, 'a') as input_dataset:
             input_dataset.setncattr('History', old_history)
 
-        mock_datetime.utcnow = Mock(return_value=datetime(2021, 5, 12, 19, 3, 4))
+        mock_datetime.now = Mock(
+            return_value=datetime(2021, 5, 12, 19, 3, 4, tzinfo=timezone.utc)
+        )
         test_data = Message(
             {
                 'accessToken': self.access_token,
@@ -413,7 +469,9 @@ class TestSwathProjector(TestCase):
         """
         input_file_path = 'tests/data/VNL2_oneBand.nc'
 
-        mock_datetime.utcnow = Mock(return_value=datetime(2021, 5, 12, 19, 3, 4))
+        mock_datetime.now = Mock(
+            return_value=datetime(2021, 5, 12, 19, 3, 4, tzinfo=timezone.utc)
+        )
         test_data = Message(
             {
                 'accessToken': self.access_token,
@@ -513,7 +571,9 @@ class TestSwathProjector(TestCase):
 
         """
         input_file_path = 'tests/data/VNL2_oneBand.nc'
-        mock_datetime.utcnow = Mock(return_value=datetime(2021, 5, 12, 19, 3, 4))
+        mock_datetime.now = Mock(
+            return_value=datetime(2021, 5, 12, 19, 3, 4, tzinfo=timezone.utc)
+        )
         test_data = Message(
             {
                 'accessToken': self.access_token,
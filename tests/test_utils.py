@@ -1,6 +1,6 @@
 """ Utility classes used to extend the unittest capabilities. """
 
-from os import sep
+from os import link, sep
 from os.path import basename
 from shutil import copy
 
@@ -20,13 +20,19 @@ class StringContains:
 
 def download_side_effect(file_path, working_dir, **kwargs):
     """A side effect to be used when mocking the `harmony.util.download`
-    function. This should copy the input file (assuming it is a local
-    file path) to the working directory, and then return the new file
-    path.
+    function. This should link the input file (assuming it is a local
+    file path) into the working directory, and then return the new file
+    path. The service only reads the downloaded file, so a hard link avoids
+    copying the contents of large test granules. If the working directory
+    is on a different file system, the file is copied instead.
 
     """
     file_base_name = basename(file_path)
     output_file_path = sep.join([working_dir, file_base_name])
 
-    copy(file_path, output_file_path)
+    try:
+        link(file_path, output_file_path)
+    except OSError:
+        copy(file_path, output_file_path)
+
     return output_file_path
@@ -1,6 +1,6 @@
 from logging import Logger
 from unittest import TestCase
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import numpy as np
 from netCDF4 import Dataset
@@ -12,6 +12,7 @@ from swath_projector.interpolation import (
     EPSILON,
     RADIUS_OF_INFLUENCE,
     check_for_valid_interpolation,
+    get_ewa_results,
     get_parameters_tuple,
     get_reprojection_cache,
     get_swath_definition,
@@ -53,6 +54,10 @@ class TestInterpolation(TestCase):
         self.mock_target_area = MagicMock(
             spec=AreaDefinition, shape='ta_shape', area_id='/lon, /lat'
         )
+        self.input_dataset = Dataset(self.message_parameters['input_file'])
+
+    def tearDown(self):
+        self.input_dataset.close()
 
     def assert_areadefinitions_equal(self, area_one, area_two):
         """Compare the properties of two AreaDefinitions."""
@@ -73,7 +78,7 @@ class TestInterpolation(TestCase):
     def test_resample_all_variables(self, mock_resample_variable):
         """Ensure resample_variable is called for each non-coordinate
         variable, and those variables are all included in the list of
-        outputs.
+        outputs. The input granule should only be opened once.
 
         The default message being supplied does not have sufficient
         information to construct a target area for all variables, so the
@@ -95,10 +100,18 @@ class TestInterpolation(TestCase):
         self.assertEqual(output_variables, expected_output)
         self.assertEqual(mock_resample_variable.call_count, 4)
 
+        # The input granule should be opened once, and shared by all variables:
+        input_datasets = {
+            id(call.args[1]) for call in mock_resample_variable.call_args_list
+        }
+        self.assertEqual(len(input_datasets), 1)
+        self.assertIsInstance(mock_resample_variable.call_args.args[1], Dataset)
+
         for variable in expected_output:
             variable_output_path = f'/tmp/01234{variable}.nc'
             mock_resample_variable.assert_any_call(
                 parameters,
+                ANY,
                 variable,
                 {},
                 variable_output_path,
@@ -135,6 +148,7 @@ class TestInterpolation(TestCase):
             variable_output_path = f'/tmp/01234{variable}.nc'
             mock_resample_variable.assert_any_call(
                 parameters,
+                ANY,
                 variable,
                 {},
                 variable_output_path,
@@ -185,6 +199,7 @@ class TestInterpolation(TestCase):
         with self.subTest('No pre-existing bilinear information'):
             resample_variable(
                 message_parameters,
+                self.input_dataset,
                 variable_name,
                 {},
                 output_path,
@@ -239,6 +254,7 @@ class TestInterpolation(TestCase):
 
             resample_variable(
                 message_parameters,
+                self.input_dataset,
                 variable_name,
                 bilinear_information,
                 output_path,
@@ -280,6 +296,7 @@ class TestInterpolation(TestCase):
 
             resample_variable(
                 message_parameters,
+                self.input_dataset,
                 variable_name,
                 input_cache,
                 output_path,
@@ -362,6 +379,7 @@ class TestInterpolation(TestCase):
         with self.subTest('No pre-existing EWA information'):
             resample_variable(
                 message_parameters,
+                self.input_dataset,
                 variable_name,
                 {},
                 output_path,
@@ -410,6 +428,7 @@ class TestInterpolation(TestCase):
 
             resample_variable(
                 message_parameters,
+                self.input_dataset,
                 variable_name,
                 ewa_information,
                 output_path,
@@ -471,6 +490,7 @@ class TestInterpolation(TestCase):
         with self.subTest('No pre-existing EWA-NN information'):
             resample_variable(
                 message_parameters,
+                self.input_dataset,
                 variable_name,
                 {},
                 output_path,
@@ -519,6 +539,7 @@ class TestInterpolation(TestCase):
 
             resample_variable(
                 message_parameters,
+                self.input_dataset,
                 variable_name,
                 ewa_nn_information,
                 output_path,
@@ -558,6 +579,7 @@ class TestInterpolation(TestCase):
 
             resample_variable(
                 message_parameters,
+                self.input_dataset,
                 variable_name,
                 cache,
                 output_path,
@@ -642,6 +664,7 @@ class TestInterpolation(TestCase):
         with self.subTest('No pre-existing nearest neighbour information'):
             resample_variable(
                 message_parameters,
+                self.input_dataset,
                 variable_name,
                 {},
                 output_path,
@@ -702,6 +725,7 @@ class TestInterpolation(TestCase):
 
             resample_variable(
                 message_parameters,
+                self.input_dataset,
                 variable_name,
                 nearest_information,
                 output_path,
@@ -743,6 +767,7 @@ class TestInterpolation(TestCase):
 
             resample_variable(
                 message_parameters,
+                self.input_dataset,
                 variable_name,
                 cache,
                 output_path,
@@ -836,6 +861,7 @@ class TestInterpolation(TestCase):
 
         resample_variable(
             message_parameters,
+            self.input_dataset,
             variable_name,
             {},
             output_path,
@@ -880,6 +906,38 @@ class TestInterpolation(TestCase):
             expected_scaling,
         )
 
+    @patch('swath_projector.interpolation.fornav')
+    def test_get_ewa_results_integer_types(self, mock_fornav):
+        """Ensure integer input values are converted to a floating point type
+        before EWA resampling. Integers that can be exactly represented as
+        float32 should use that type, while wider integers use float64.
+
+        """
+        mock_fornav.return_value = ('', np.array([[1.0, 2.0], [3.0, 4.0]]))
+        ewa_information = {'columns': 'cols', 'rows': 'rows', 'target_area': 'area'}
+
+        test_args = [
+            ['uint8', np.uint8, np.float32],
+            ['int16', np.int16, np.float32],
+            ['int32', np.int32, np.float64],
+            ['float32', np.float32, np.float32],
+            ['float64', np.float64, np.float64],
+        ]
+
+        for description, input_type, expected_type in test_args:
+            with self.subTest(description):
+                input_values = np.array([[1, 2], [3, 4]], dtype=input_type)
+                get_ewa_results(
+                    {'values': input_values, 'fill_value': None},
+                    ewa_information,
+                    False,
+                )
+
+                resampled_values = mock_fornav.call_args[0][3]
+                self.assertEqual(resampled_values.dtype, expected_type)
+                np.testing.assert_array_equal(resampled_values, input_values)
+                mock_fornav.reset_mock()
+
     def test_check_for_valid_interpolation(self):
         """Ensure all valid interpolations don't raise an exception."""
         interpolations = ['bilinear', 'ewa', 'ewa-nn', 'near']
@@ -901,11 +959,11 @@ class TestInterpolation(TestCase):
         values should be correctly stored in the swath definition.
 
         """
-        dataset = Dataset('tests/data/africa.nc')
-        longitudes = dataset['/lon']
-        latitudes = dataset['/lat']
-        coordinates = ('/lat', '/lon')
-        swath_definition = get_swath_definition(dataset, coordinates)
+        with Dataset('tests/data/africa.nc') as dataset:
+            longitudes = dataset['/lon'][:]
+            latitudes = dataset['/lat'][:]
+
+        swath_definition = get_swath_definition(longitudes, latitudes)
 
         self.assertEqual(swath_definition.shape, longitudes.shape)
         np.testing.assert_array_equal(longitudes, swath_definition.lons)
@@ -932,8 +990,9 @@ class TestInterpolation(TestCase):
         dataset['longitude'][:] = raw_lon_values[:]
         dataset['latitude'][:] = lat_values[:]
 
-        coordinates = ('/latitude', '/longitude')
-        swath_definition = get_swath_definition(dataset, coordinates)
+        swath_definition = get_swath_definition(
+            dataset['longitude'][:], dataset['latitude'][:]
+        )
 
         self.assertEqual(swath_definition.shape, lat_values.shape)
         np.testing.assert_array_equal(lat_values, swath_definition.lats)
@@ -960,8 +1019,9 @@ class TestInterpolation(TestCase):
         dataset['longitude'][:] = lon_values[:]
         dataset['latitude'][:] = lat_values[:]
 
-        coordinates = ('/latitude', '/longitude')
-        swath_definition = get_swath_definition(dataset, coordinates)
+        swath_definition = get_swath_definition(
+            dataset['longitude'][:], dataset['latitude'][:]
+        )
 
         self.assertEqual(swath_definition.shape, (lat_values.size, 1))
         np.testing.assert_array_equal(lat_values_2d, swath_definition.lats)
@@ -1073,10 +1133,7 @@ class TestInterpolation(TestCase):
 
     @patch('swath_projector.interpolation.get_projected_resolution')
     @patch('swath_projector.interpolation.get_extents_from_perimeter')
-    @patch('swath_projector.interpolation.get_coordinate_variable')
-    def test_get_target_area_minimal(
-        self, mock_get_coordinates, mock_get_extents, mock_get_resolution
-    ):
+    def test_get_target_area_minimal(self, mock_get_extents, mock_get_resolution):
         """If the Harmony message does not define a target area, then that
         information should be derived from the coordinate variables
         referred to in the variable metadata.
@@ -1089,7 +1146,6 @@ class TestInterpolation(TestCase):
         """
         latitudes = 'lats'
         longitudes = 'lons'
-        mock_get_coordinates.side_effect = [latitudes, longitudes]
         mock_get_extents.return_value = (-20, 20, 0, 40)
         mock_get_resolution.return_value = 2.0
 
@@ -1102,16 +1158,13 @@ class TestInterpolation(TestCase):
         )
 
         target_area = get_target_area(
-            self.message_parameters, 'coordinate_group', ('/lat', '/lon'), self.logger
+            self.message_parameters,
+            longitudes,
+            latitudes,
+            ('/lat', '/lon'),
+            self.logger,
         )
 
-        self.assertEqual(mock_get_coordinates.call_count, 2)
-        mock_get_coordinates.assert_any_call(
-            'coordinate_group', ('/lat', '/lon'), 'lat'
-        )
-        mock_get_coordinates.assert_any_call(
-            'coordinate_group', ('/lat', '/lon'), 'lon'
-        )
         mock_get_extents.assert_called_once_with(
             self.message_parameters['projection'], longitudes, latitudes
         )
@@ -1123,10 +1176,7 @@ class TestInterpolation(TestCase):
 
     @patch('swath_projector.interpolation.get_projected_resolution')
     @patch('swath_projector.interpolation.get_extents_from_perimeter')
-    @patch('swath_projector.interpolation.get_coordinate_variable')
-    def test_get_target_area_extents(
-        self, mock_get_coordinates, mock_get_extents, mock_get_resolution
-    ):
+    def test_get_target_area_extents(self, mock_get_extents, mock_get_resolution):
         """If the Harmony message defines the target area extents, these
         should be used, with the dimensions and resolution of the output
         being defined by the coordinate data from the variable.
@@ -1134,7 +1184,6 @@ class TestInterpolation(TestCase):
         """
         latitudes = 'lats'
         longitudes = 'lons'
-        mock_get_coordinates.side_effect = [latitudes, longitudes]
         mock_get_extents.return_value = (-20, 20, 0, 40)
         mock_get_resolution.return_value = 2.0
 
@@ -1153,16 +1202,13 @@ class TestInterpolation(TestCase):
         )
 
         target_area = get_target_area(
-            self.message_parameters, 'coordinate_group', ('/lat', '/lon'), self.logger
+            self.message_parameters,
+            longitudes,
+            latitudes,
+            ('/lat', '/lon'),
+            self.logger,
         )
 
-        self.assertEqual(mock_get_coordinates.call_count, 2)
-        mock_get_coordinates.assert_any_call(
-            'coordinate_group', ('/lat', '/lon'), 'lat'
-        )
-        mock_get_coordinates.assert_any_call(
-            'coordinate_group', ('/lat', '/lon'), 'lon'
-        )
         mock_get_extents.assert_not_called()
         mock_get_resolution.assert_called_once_with(
             self.message_parameters['projection'], longitudes, latitudes
@@ -1172,9 +1218,8 @@ class TestInterpolation(TestCase):
 
     @patch('swath_projector.interpolation.get_projected_resolution')
     @patch('swath_projector.interpolation.get_extents_from_perimeter')
-    @patch('swath_projector.interpolation.get_coordinate_variable')
     def test_get_target_area_extents_resolutions(
-        self, mock_get_coordinates, mock_get_extents, mock_get_resolution
+        self, mock_get_extents, mock_get_resolution
     ):
         """If the Harmony message defines the target area extents and
         resolutions, these should be used for the target area definition.
@@ -1185,7 +1230,6 @@ class TestInterpolation(TestCase):
         """
         latitudes = 'lats'
         longitudes = 'lons'
-        mock_get_coordinates.side_effect = [latitudes, longitudes]
         mock_get_extents.return_value = (-20, 20, 0, 40)
         mock_get_resolution.return_value = 2.0
 
@@ -1206,16 +1250,13 @@ class TestInterpolation(TestCase):
         )
 
         target_area = get_target_area(
-            self.message_parameters, 'coordinate_group', ('/lat', '/lon'), self.logger
+            self.message_parameters,
+            longitudes,
+            latitudes,
+            ('/lat', '/lon'),
+            self.logger,
         )
 
-        self.assertEqual(mock_get_coordinates.call_count, 2)
-        mock_get_coordinates.assert_any_call(
-            'coordinate_group', ('/lat', '/lon'), 'lat'
-        )
-        mock_get_coordinates.assert_any_call(
-            'coordinate_group', ('/lat', '/lon'), 'lon'
-        )
         mock_get_extents.assert_not_called()
         mock_get_resolution.assert_not_called()
 
@@ -1223,9 +1264,8 @@ class TestInterpolation(TestCase):
 
     @patch('swath_projector.interpolation.get_projected_resolution')
     @patch('swath_projector.interpolation.get_extents_from_perimeter')
-    @patch('swath_projector.interpolation.get_coordinate_variable')
     def test_get_target_area_extents_dimensions(
-        self, mock_get_coordinates, mock_get_extents, mock_get_resolution
+        self, mock_get_extents, mock_get_resolution
     ):
         """If the Harmony message defines the target area extents and
         dimensions, these should be used for the target area definition.
@@ -1236,7 +1276,6 @@ class TestInterpolation(TestCase):
         """
         latitudes = 'lats'
         longitudes = 'lons'
-        mock_get_coordinates.side_effect = [latitudes, longitudes]
         mock_get_extents.return_value = (-20, 20, 0, 40)
         mock_get_resolution.return_value = 2.0
 
@@ -1256,16 +1295,13 @@ class TestInterpolation(TestCase):
         )
 
         target_area = get_target_area(
-            self.message_parameters, 'coordinate_group', ('/lat', '/lon'), self.logger
+            self.message_parameters,
+            longitudes,
+            latitudes,
+            ('/lat', '/lon'),
+            self.logger,
         )
 
-        self.assertEqual(mock_get_coordinates.call_count, 2)
-        mock_get_coordinates.assert_any_call(
-            'coordinate_group', ('/lat', '/lon'), 'lat'
-        )
-        mock_get_coordinates.assert_any_call(
-            'coordinate_group', ('/lat', '/lon'), 'lon'
-        )
         mock_get_extents.assert_not_called()
         mock_get_resolution.assert_not_called()
 
@@ -1273,10 +1309,7 @@ class TestInterpolation(TestCase):
 
     @patch('swath_projector.interpolation.get_projected_resolution')
     @patch('swath_projector.interpolation.get_extents_from_perimeter')
-    @patch('swath_projector.interpolation.get_coordinate_variable')
-    def test_get_target_area_dimensions(
-        self, mock_get_coordinates, mock_get_extents, mock_get_resolution
-    ):
+    def test_get_target_area_dimensions(self, mock_get_extents, mock_get_resolution):
         """If the Harmony message defines the target area dimensions, then
         that information should be used, along with the extents as
         defined by the variables associated coordinates.
@@ -1284,7 +1317,6 @@ class TestInterpolation(TestCase):
         """
         latitudes = 'lats'
         longitudes = 'lons'
-        mock_get_coordinates.side_effect = [latitudes, longitudes]
         mock_get_extents.return_value = (-20, 20, 0, 40)
         mock_get_resolution.return_value = 4.0
 
@@ -1300,16 +1332,13 @@ class TestInterpolation(TestCase):
         )
 
         target_area = get_target_area(
-            self.message_parameters, 'coordinate_group', ('/lat', '/lon'), self.logger
+            self.message_parameters,
+            longitudes,
+            latitudes,
+            ('/lat', '/lon'),
+            self.logger,
         )
 
-        self.assertEqual(mock_get_coordinates.call_count, 2)
-        mock_get_coordinates.assert_any_call(
-            'coordinate_group', ('/lat', '/lon'), 'lat'
-        )
-        mock_get_coordinates.assert_any_call(
-            'coordinate_group', ('/lat', '/lon'), 'lon'
-        )
         mock_get_extents.assert_called_once_with(
             message_parameters['projection'], longitudes, latitudes
         )
@@ -1319,10 +1348,7 @@ class TestInterpolation(TestCase):
 
     @patch('swath_projector.interpolation.get_projected_resolution')
     @patch('swath_projector.interpolation.get_extents_from_perimeter')
-    @patch('swath_projector.interpolation.get_coordinate_variable')
-    def test_get_target_area_resolutions(
-        self, mock_get_coordinates, mock_get_extents, mock_get_resolution
-    ):
+    def test_get_target_area_resolutions(self, mock_get_extents, mock_get_resolution):
         """If the Harmony message defines the target area resolutions, then
         that information should be used, along with the extents as
         defined by the variables associated coordinates.
@@ -1330,7 +1356,6 @@ class TestInterpolation(TestCase):
         """
         latitudes = 'lats'
         longitudes = 'lons'
-        mock_get_coordinates.side_effect = [latitudes, longitudes]
         mock_get_extents.return_value = (-20, 20, 0, 40)
         mock_get_resolution.return_value = 2.0
 
@@ -1347,16 +1372,13 @@ class TestInterpolation(TestCase):
         )
 
         target_area = get_target_area(
-            self.message_parameters, 'coordinate_group', ('/lat', '/lon'), self.logger
+            self.message_parameters,
+            longitudes,
+            latitudes,
+            ('/lat', '/lon'),
+            self.logger,
         )
 
-        self.assertEqual(mock_get_coordinates.call_count, 2)
-        mock_get_coordinates.assert_any_call(
-            'coordinate_group', ('/lat', '/lon'), 'lat'
-        )
-        mock_get_coordinates.assert_any_call(
-            'coordinate_group', ('/lat', '/lon'), 'lon'
-        )
         mock_get_extents.assert_called_once_with(
             message_parameters['projection'], longitudes, latitudes
         )
@@ -1,21 +1,29 @@
 import json
 import logging
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 from unittest import TestCase
 from unittest.mock import Mock, patch
 
+import numpy as np
 from netCDF4 import Dataset
 from varinfo import VarInfoFromNetCDF4
 
 from swath_projector.exceptions import MissingReprojectedDataError
 from swath_projector.nc_merge import (
     check_coor_valid,
+    copy_packed_tiles,
     create_history_record,
     create_output,
+    get_compression_level,
+    get_coordinate_shapes,
+    get_dimension_sizes,
     get_fill_value_from_attributes,
+    get_science_coordinates,
     get_science_variable_attributes,
     get_science_variable_dimensions,
+    get_supporting_variables,
+    pack_data,
     read_attrs,
 )
 from swath_projector.reproject import CF_CONFIG_FILE
@@ -57,9 +65,12 @@ class TestNCMerge(TestCase):
             cls.logger,
             cls.var_info,
         )
+        cls.input_dataset = Dataset(cls.properties['input_file'])
 
     @classmethod
     def tearDownClass(cls):
+        cls.input_dataset.close()
+
         if os.path.exists(cls.output_file):
             os.remove(cls.output_file)
 
@@ -81,12 +92,37 @@ class TestNCMerge(TestCase):
 
         """
         test_dataset = 'sea_surface_temperature'
-        in_dataset = Dataset(self.properties['input_file'])
-        out_dataset = Dataset(self.output_file)
-        self.assertEqual(
-            len(in_dataset[test_dataset].dimensions),
-            len(out_dataset[test_dataset].dimensions),
-        )
+        with Dataset(self.output_file) as out_dataset:
+            self.assertEqual(
+                len(self.input_dataset[test_dataset].dimensions),
+                len(out_dataset[test_dataset].dimensions),
+            )
+
+    def test_output_compression_level(self):
+        """The compression level should be resolved once per output file, so
+        an invalid `HARMONY_NC_COMPLEVEL` value only logs a single warning,
+        and all non-scalar variables use the default compression level.
+
+        """
+        with patch.dict(os.environ, {'HARMONY_NC_COMPLEVEL': 'high'}):
+            with self.assertLogs(self.logger, 'WARNING') as logs:
+                create_output(
+                    self.properties,
+                    self.output_file,
+                    self.tmp_dir,
+                    self.science_variables,
+                    self.metadata_variables,
+                    self.logger,
+                    self.var_info,
+                )
+
+        self.assertEqual(len(logs.records), 1)
+
+        with Dataset(self.output_file) as out_dataset:
+            for variable in out_dataset.variables.values():
+                if variable.dimensions:
+                    with self.subTest(variable.name):
+                        self.assertEqual(variable.filters()['complevel'], 1)
 
     @patch('swath_projector.nc_merge.datetime')
     def test_output_global_attributes(self, mock_datetime):
@@ -95,7 +131,9 @@ class TestNCMerge(TestCase):
         not originally present) and `history_json`.
 
         """
-        mock_datetime.utcnow = Mock(return_value=datetime(2021, 5, 12, 19, 3, 4))
+        mock_datetime.now = Mock(
+            return_value=datetime(2021, 5, 12, 19, 3, 4, tzinfo=timezone.utc)
+        )
 
         create_output(
             self.properties,
@@ -107,8 +145,7 @@ class TestNCMerge(TestCase):
             self.var_info,
         )
 
-        with Dataset(self.properties['input_file']) as in_dataset:
-            input_attrs = read_attrs(in_dataset)
+        input_attrs = read_attrs(self.input_dataset)
 
         with Dataset(self.output_file) as out_dataset:
             output_attrs = read_attrs(out_dataset)
@@ -169,21 +206,21 @@ class TestNCMerge(TestCase):
     def test_same_num_of_dataset_attributes(self):
         """Variables in input should have the same number of attributes."""
         test_variable = 'sea_surface_temperature'
-        in_dataset = Dataset(self.properties['input_file'])
-        out_dataset = Dataset(self.output_file)
-        inf_data = in_dataset[test_variable]
-        out_data = out_dataset[test_variable]
-        input_attrs = read_attrs(inf_data)
-        output_attrs = read_attrs(out_data)
+        input_attrs = read_attrs(self.input_dataset[test_variable])
+
+        with Dataset(self.output_file) as out_dataset:
+            output_attrs = read_attrs(out_dataset[test_variable])
+
         self.assertEqual(len(input_attrs), len(output_attrs))
 
     def test_same_data_type(self):
         """Variables in input and output should have same data type."""
         test_variable = 'sea_surface_temperature'
-        in_dataset = Dataset(self.properties['input_file'])
-        out_dataset = Dataset(self.output_file)
-        input_data_type = in_dataset[test_variable].datatype
-        output_data_type = out_dataset[test_variable].datatype
+        input_data_type = self.input_dataset[test_variable].datatype
+
+        with Dataset(self.output_file) as out_dataset:
+            output_data_type = out_dataset[test_variable].datatype
+
         self.assertEqual(input_data_type, output_data_type, 'Should be equal')
 
     def test_missing_file_raises_error(self):
@@ -223,6 +260,103 @@ class TestNCMerge(TestCase):
         with self.subTest('_FillValue absent, returns None'):
             self.assertEqual(get_fill_value_from_attributes({}), None)
 
+    def test_pack_data(self):
+        """Unpacked data should have the offset and scale factor applied, so
+        they are correctly packed on write. Fill values should be retained.
+
+        """
+        raw_data = np.array([[1.5, 2.5], [-9999.0, 4.5]])
+
+        with self.subTest('Scaled data with a fill value'):
+            packed_data = pack_data(raw_data, 0.5, 0.5, -9999.0, np.dtype('float64'))
+            np.testing.assert_array_equal(
+                packed_data, np.array([[2.0, 4.0], [-9999.0, 8.0]])
+            )
+            self.assertEqual(packed_data.dtype, np.float64)
+
+        with self.subTest('No fill value'):
+            np.testing.assert_array_equal(
+                pack_data(raw_data, 1, 0, None, np.dtype('float64')), raw_data
+            )
+
+        with self.subTest('Integer output is rounded, not truncated'):
+            packed_data = pack_data(
+                np.array([0.3, -0.3, 19.05], dtype=np.float32),
+                np.float32(0.15),
+                np.float32(0.0),
+                None,
+                np.dtype('int8'),
+            )
+            np.testing.assert_array_equal(packed_data, np.array([2, -2, 127]))
+            self.assertEqual(packed_data.dtype, np.int8)
+
+        with self.subTest('Rounded integer output is clipped to the type range'):
+            packed_data = pack_data(
+                np.array([-128.6 * 0.15, 127.6 * 0.15]),
+                0.15,
+                0.0,
+                None,
+                np.dtype('int8'),
+            )
+            np.testing.assert_array_equal(packed_data, np.array([-128, 127]))
+
+    def test_copy_packed_tiles(self):
+        """Values should be packed and written in tiles of complete rows,
+        matching the chunking of the output variable, so that all rows are
+        written, including a final partial tile.
+
+        """
+        unpacked_data = np.arange(10.0).reshape(5, 2) * 0.5
+
+        with Dataset('single_band.nc', 'w', diskless=True) as single_band_dataset:
+            single_band_dataset.createDimension('y', size=5)
+            single_band_dataset.createDimension('x', size=2)
+            single_band_variable = single_band_dataset.createVariable(
+                'science', unpacked_data.dtype, dimensions=('y', 'x')
+            )
+            single_band_variable[:] = unpacked_data
+
+            with Dataset('merged.nc', 'w', diskless=True) as output_dataset:
+                output_dataset.createDimension('y', size=5)
+                output_dataset.createDimension('x', size=2)
+                output_variable = output_dataset.createVariable(
+                    'science', 'i2', dimensions=('y', 'x'), chunksizes=(2, 2)
+                )
+
+                copy_packed_tiles(single_band_variable, output_variable, 0.5, 0.0, None)
+
+                output_variable.set_auto_maskandscale(False)
+                np.testing.assert_array_equal(
+                    output_variable[:], np.arange(10).reshape(5, 2)
+                )
+
+    def test_get_compression_level(self):
+        """The default compression level should be used, unless overridden by
+        the `HARMONY_NC_COMPLEVEL` environment variable. Values that are not
+        integers from 0 to 9 should be ignored, with a logged warning.
+
+        """
+        with self.subTest('No environment variable, uses default'):
+            with patch.dict(os.environ, clear=True):
+                self.assertEqual(get_compression_level(self.logger), 1)
+
+        with self.subTest('Environment variable overrides default'):
+            with patch.dict(os.environ, {'HARMONY_NC_COMPLEVEL': '6'}):
+                self.assertEqual(get_compression_level(self.logger), 6)
+
+        with self.subTest('Minimum and maximum levels are valid'):
+            for level in ['0', '9']:
+                with patch.dict(os.environ, {'HARMONY_NC_COMPLEVEL': level}):
+                    self.assertEqual(get_compression_level(self.logger), int(level))
+
+        for invalid_level in ['high', '4.5', '-1', '10']:
+            with self.subTest(f'Invalid value "{invalid_level}" uses default'):
+                with patch.dict(os.environ, {'HARMONY_NC_COMPLEVEL': invalid_level}):
+                    with self.assertLogs(self.logger, 'WARNING') as logs:
+                        self.assertEqual(get_compression_level(self.logger), 1)
+
+                    self.assertIn(invalid_level, logs.output[0])
+
     def test_check_coord_valid(self):
         """If some of the listed coordinates are not in the single band
         output, then the function should return `False`. If any of the
@@ -234,36 +368,94 @@ class TestNCMerge(TestCase):
         """
         test_dataset_name = 'sea_surface_temperature.nc'
         single_band_dataset = Dataset(f'{self.tmp_dir}{test_dataset_name}')
-        input_dataset = Dataset(self.properties['input_file'])
+        self.addCleanup(single_band_dataset.close)
+        coordinates = {'/lat', '/lon'}
+        input_coordinate_shapes = {'/lat': (768, 3200), '/lon': (768, 3200)}
 
         with self.subTest('No coordinate data returns True'):
             self.assertTrue(
+                check_coor_valid(set(), input_coordinate_shapes, single_band_dataset)
+            )
+
+        with self.subTest('Reprojected data missing coordinates returns False'):
+            self.assertFalse(
                 check_coor_valid(
-                    self.var_info, '/lat', input_dataset, single_band_dataset
+                    {'/lat', '/missing'}, input_coordinate_shapes, single_band_dataset
                 )
             )
 
-        with self.subTest('Reprojected data missing coordinates returns False'):
+        with self.subTest('Reprojected coordinates with new shapes returns False'):
             self.assertFalse(
                 check_coor_valid(
-                    self.var_info,
-                    '/brightness_temperature_4um',
-                    input_dataset,
-                    single_band_dataset,
+                    coordinates, input_coordinate_shapes, single_band_dataset
                 )
             )
 
         with self.subTest('Reprojected data with preserved coordinates returns True'):
-            # To ensure a match, this uses two different reprojected output
-            # files, as these are guaranteed to match coordinate shapes.
-            second_dataset = Dataset(f'{self.tmp_dir}wind_speed.nc')
+            # To ensure a match, this uses the shapes of coordinates from a
+            # different reprojected output file, as these are guaranteed to
+            # match coordinate shapes.
+            with Dataset(f'{self.tmp_dir}wind_speed.nc') as second_dataset:
+                second_shapes = get_coordinate_shapes(second_dataset, coordinates)
 
             self.assertTrue(
-                check_coor_valid(
-                    self.var_info, '/wind_speed', second_dataset, single_band_dataset
-                )
+                check_coor_valid(coordinates, second_shapes, single_band_dataset)
             )
 
+    def test_get_dimension_sizes(self):
+        """Ensure the sizes of all root group dimensions are retrieved."""
+        with Dataset(f'{self.tmp_dir}wind_speed.nc') as single_band_dataset:
+            self.assertDictEqual(
+                get_dimension_sizes(single_band_dataset), {'lat': 100, 'lon': 300}
+            )
+
+    def test_get_supporting_variables(self):
+        """Ensure only variables from the single band dataset that are not the
+        science variable, and are not yet in the output, are returned.
+
+        """
+        with Dataset(f'{self.tmp_dir}wind_speed.nc') as single_band_dataset:
+            with self.subTest('Empty output dataset'):
+                with Dataset('empty.nc', 'w', diskless=True) as output_dataset:
+                    self.assertListEqual(
+                        get_supporting_variables(
+                            single_band_dataset, output_dataset, 'wind_speed'
+                        ),
+                        ['latitude_longitude', 'lat', 'lon'],
+                    )
+
+            with self.subTest('Supporting variables already in output'):
+                with Dataset(self.output_file) as output_dataset:
+                    self.assertListEqual(
+                        get_supporting_variables(
+                            single_band_dataset, output_dataset, 'wind_speed'
+                        ),
+                        [],
+                    )
+
+    def test_get_science_coordinates(self):
+        """Ensure the coordinates of each science variable are retrieved, and
+        that a variable unknown to `earthdata-varinfo` has no coordinates.
+
+        """
+        self.assertDictEqual(
+            get_science_coordinates(
+                self.var_info, {'/wind_speed', '/lat', 'missing_variable'}
+            ),
+            {
+                '/wind_speed': {'/lat', '/lon'},
+                '/lat': set(),
+                'missing_variable': set(),
+            },
+        )
+
+    def test_get_coordinate_shapes(self):
+        """Ensure shapes are only returned for variables in the dataset."""
+        self.assertDictEqual(
+            get_coordinate_shapes(self.input_dataset, {'/lat', '/lon', '/missing'}),
+            {'/lat': (768, 3200), '/lon': (768, 3200)},
+        )
+
     def test_get_science_variable_dimensions(self):
         """Ensure that the retrieved dimensions match those in the single band
         dataset. If the input dataset includes a time dimension, that
@@ -272,7 +464,8 @@ class TestNCMerge(TestCase):
         """
         variable_name = 'sea_surface_temperature'
         single_band_dataset = Dataset(f'{self.tmp_dir}{variable_name}.nc')
-        input_dataset = Dataset(self.properties['input_file'])
+        self.addCleanup(single_band_dataset.close)
+        input_dataset = self.input_dataset
 
         with self.subTest('Input dataset has time dimension.'):
             dimensions = get_science_variable_dimensions(
@@ -298,12 +491,13 @@ class TestNCMerge(TestCase):
         """
         variable_name = 'sea_surface_temperature'
         single_band_dataset = Dataset(f'{self.tmp_dir}{variable_name}.nc')
-        input_dataset = Dataset(self.properties['input_file'])
+        self.addCleanup(single_band_dataset.close)
+        input_dataset = self.input_dataset
 
         with self.subTest('Coordinates remain valid.'):
             mock_check_coord_valid.return_value = True
             attributes = get_science_variable_attributes(
-                input_dataset, single_band_dataset, variable_name, self.var_info
+                input_dataset, single_band_dataset, variable_name, set(), {}
             )
 
             input_attributes = input_dataset[variable_name].__dict__
@@ -322,7 +516,7 @@ class TestNCMerge(TestCase):
         with self.subTest('Coordinates are no longer valid.'):
             mock_check_coord_valid.return_value = False
             attributes = get_science_variable_attributes(
-                input_dataset, single_band_dataset, variable_name, self.var_info
+                input_dataset, single_band_dataset, variable_name, set(), {}
             )
 
             input_attributes = input_dataset[variable_name].__dict__
@@ -340,14 +534,13 @@ class TestNCMerge(TestCase):
                 attributes['grid_mapping'], single_band_attributes['grid_mapping']
             )
 
-    @patch('swath_projector.nc_merge.datetime')
-    def test_create_history_record(self, mock_datetime):
+    def test_create_history_record(self):
         """Ensure a history record is correctly constructed, and only contains
         a `cf_history` attribute if there is valid a `history` (or
         `History`) attribute specified from the input.
 
         """
-        mock_datetime.utcnow = Mock(return_value=datetime(2001, 2, 3, 4, 5, 6))
+        date_time = '2001-02-03T04:05:06+00:00'
         granule_url = 'https://example.com/input.nc4'
         request_parameters = {
             'crs': '+proj=longlat',
@@ -366,7 +559,8 @@ class TestNCMerge(TestCase):
                 'program_ref': 'https://cmr.uat.earthdata.nasa.gov/search/concepts/S1237974711-EEDTEST',
             }
             self.assertDictEqual(
-                create_history_record(None, request_parameters), expected_output
+                create_history_record(None, request_parameters, date_time),
+                expected_output,
             )
 
         string_history = '2000-12-31T00:00:00+00.00 Swathinator v0.0.1'
@@ -384,12 +578,12 @@ class TestNCMerge(TestCase):
 
         with self.subTest('String history specified in input file'):
             self.assertDictEqual(
-                create_history_record(string_history, request_parameters),
+                create_history_record(string_history, request_parameters, date_time),
                 expected_output_with_history,
             )
 
         with self.subTest('List history specified in input file'):
             self.assertDictEqual(
-                create_history_record(list_history, request_parameters),
+                create_history_record(list_history, request_parameters, date_time),
                 expected_output_with_history,
             )
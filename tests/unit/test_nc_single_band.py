@@ -291,7 +291,13 @@ class TestNCSingleBand(TestCase):
             dataset.createDimension('lat_1', size=2)
             dataset.createDimension('lon_1', size=4)
 
-            write_dimension_variables(dataset, ('lat_1', 'lon_1'), self.area_definition)
+            cache = {('lat', 'lon'): {'dimensions': ('lat_1', 'lon_1')}}
+            write_dimension_variables(
+                dataset, ('lat_1', 'lon_1'), self.area_definition, cache
+            )
+
+            # The projected vectors are saved in the cache.
+            self.assertIn('projected_vectors', cache[('lat', 'lon')])
 
             # The dimension variables exist.
             self.assertIn('lat_1', dataset.variables)
@@ -322,3 +328,43 @@ class TestNCSingleBand(TestCase):
             # The data values are correct.
             np.testing.assert_array_equal(dataset['lat_1'][:], self.lat_values)
             np.testing.assert_array_equal(dataset['lon_1'][:], self.lon_values)
+
+    def test_write_dimension_variables_cached(self):
+        """Ensure that projected vectors already in the reprojection cache are
+        used, rather than being recalculated from the target area. This
+        includes the case where the target area is fully defined by the
+        Harmony message.
+
+        """
+        cached_lat = np.array([1.0, 2.0])
+        cached_lon = np.array([3.0, 4.0, 5.0, 6.0])
+        cached_vectors = (cached_lon, cached_lat)
+        harmony_target_area = AreaDefinition.from_extent(
+            HARMONY_TARGET, '+proj=longlat', (2, 4), (-5, 40, 5, 50)
+        )
+
+        test_args = [
+            [
+                'Coordinates key',
+                self.area_definition,
+                {('lat', 'lon'): {'projected_vectors': cached_vectors}},
+            ],
+            [
+                'Harmony message target area',
+                harmony_target_area,
+                {HARMONY_TARGET: {'projected_vectors': cached_vectors}},
+            ],
+        ]
+
+        for description, target_area, cache in test_args:
+            with self.subTest(description):
+                with Dataset('test.nc', 'w', diskless=True) as dataset:
+                    dataset.createDimension('lat', size=2)
+                    dataset.createDimension('lon', size=4)
+
+                    write_dimension_variables(
+                        dataset, ('lat', 'lon'), target_area, cache
+                    )
+
+                    np.testing.assert_array_equal(dataset['lat'][:], cached_lat)
+                    np.testing.assert_array_equal(dataset['lon'][:], cached_lon)
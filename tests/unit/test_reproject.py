@@ -4,7 +4,12 @@ from unittest import TestCase
 from harmony.message import Message
 from pyproj import Proj
 
-from swath_projector.reproject import CRS_DEFAULT, get_parameters_from_message, rgetattr
+from swath_projector.reproject import (
+    CRS_DEFAULT,
+    get_parameters_from_message,
+    get_projection,
+    rgetattr,
+)
 
 
 class TestReproject(TestCase):
@@ -216,6 +221,18 @@ class TestReproject(TestCase):
         )
         self.assert_parameters_equal(parameters, expected_parameters)
 
+    def test_get_projection(self):
+        """Ensure a `pyproj.Proj` instance is returned for the requested CRS,
+        and that the same instance is returned for subsequent requests with
+        the same CRS.
+
+        """
+        projection = get_projection(CRS_DEFAULT)
+        self.assertIsInstance(projection, Proj)
+        self.assertEqual(projection, Proj(CRS_DEFAULT))
+        self.assertIs(get_projection(CRS_DEFAULT), projection)
+        self.assertIsNot(get_projection('EPSG:6933'), projection)
+
     def test_rgetattr(self):
         """Ensure the utility function to recursively retrieve a class
         attribute will work as expected.
@@ -242,6 +259,7 @@ class TestReproject(TestCase):
             ['Absent attribute uses default', 'absent', default],
             ['Absent nested attribute uses default', 'inner.absent', default],
             ['Absent outer for nested uses default', 'absent.interpolation', default],
+            ['Absent outer, default has nested attribute', 'absent.upper', default],
             [
                 'Outer present, but not object, uses default',
                 'user.interpolation',
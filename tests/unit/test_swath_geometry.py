@@ -171,6 +171,31 @@ class TestSwathGeometry(TestCase):
 
         self.assertCountEqual(coordinates, expected_points)
 
+    def test_get_perimeter_coordinates_date_line(self):
+        """Ensure that longitudes are adjusted for a swath crossing the
+        International Date Line, without altering the input array.
+
+        """
+        longitudes = np.array([[165.0, 175.0, -175.0], [165.0, 175.0, -175.0]])
+        input_longitudes = longitudes.copy()
+        latitudes = np.array([[10.0, 10.0, 10.0], [0.0, 0.0, 0.0]])
+        mask = np.ma.masked_where(np.zeros(longitudes.shape), np.ones(longitudes.shape))
+
+        coordinates = get_perimeter_coordinates(longitudes, latitudes, mask)
+
+        self.assertCountEqual(
+            coordinates,
+            [
+                (165.0, 10.0),
+                (175.0, 10.0),
+                (185.0, 10.0),
+                (165.0, 0.0),
+                (175.0, 0.0),
+                (185.0, 0.0),
+            ],
+        )
+        np.testing.assert_array_equal(longitudes, input_longitudes)
+
     def test_reproject_coordinates(self):
         """Ensure a set of points will be correctly projected."""
         proj = Proj('EPSG:32603')
@@ -9,6 +9,8 @@ from swath_projector.exceptions import MissingCoordinatesError
 from swath_projector.utilities import (
     construct_absolute_path,
     create_coordinates_key,
+    fill_masked_values,
+    get_chunk_sizes,
     get_coordinate_variable,
     get_rows_per_scan,
     get_scale_and_offset,
@@ -125,12 +127,49 @@ class TestUtilities(TestCase):
                 self.assertIsInstance(returned_data, np.ndarray)
                 np.testing.assert_array_equal(input_data, returned_data)
 
+    def test_fill_masked_values(self):
+        """Ensure masked pixels are set to the fill value, and that the data
+        array of the masked array is returned without a copy.
+
+        """
+        with self.subTest('Masked pixels use specified fill value.'):
+            masked_values = np.ma.masked_array(
+                np.array([[1.0, 2.0], [3.0, 4.0]]),
+                mask=[[False, True], [False, False]],
+            )
+            filled_values = fill_masked_values(masked_values, -9999.0)
+
+            self.assertNotIsInstance(filled_values, np.ma.MaskedArray)
+            self.assertTrue(np.shares_memory(filled_values, masked_values))
+            np.testing.assert_array_equal(
+                filled_values, np.array([[1.0, -9999.0], [3.0, 4.0]])
+            )
+
+        with self.subTest('No fill value uses masked array default.'):
+            masked_values = np.ma.masked_array(
+                np.array([1, 2, 3], dtype=np.int16),
+                mask=[True, False, False],
+                fill_value=-1,
+            )
+            np.testing.assert_array_equal(
+                fill_masked_values(masked_values, None), np.array([-1, 2, 3])
+            )
+
+        with self.subTest('No masked pixels returns unchanged data.'):
+            input_data = np.array([5, 6, 7], dtype=np.uint8)
+            masked_values = np.ma.masked_array(input_data)
+            filled_values = fill_masked_values(masked_values, 0)
+
+            self.assertTrue(np.shares_memory(filled_values, input_data))
+            np.testing.assert_array_equal(filled_values, np.array([5, 6, 7]))
+
     def test_get_coordinate_variables(self):
         """Ensure the longitude or latitude coordinate variable, is retrieved
         when requested.
 
         """
         dataset = Dataset('tests/data/africa.nc')
+        self.addCleanup(dataset.close)
         coordinates_tuple = ['lat', 'lon']
 
         for coordinate in coordinates_tuple:
@@ -229,6 +268,12 @@ class TestUtilities(TestCase):
                 )
             self.assertEqual(variable_path, expected_path)
 
+        with self.subTest('Directory with trailing separator'):
+            self.assertEqual(
+                get_variable_file_path('/tmp_dir/', 'var_one', file_extension),
+                '/tmp_dir/var_one.nc',
+            )
+
     def test_get_scale_and_offset(self):
         """Ensure that the scaling attributes can be correctly returned from
         the input variable attributes, or an empty dictionary if both
@@ -272,6 +317,8 @@ class TestUtilities(TestCase):
             ['Reference in group', 'variable', '/group', '/group/variable'],
             ['Reference in parent', '../variable', '/group', '/variable'],
             ['Reference in grandparent', '../../var', '/g1/g2', '/var'],
+            ['Reference in root group', 'variable', '', '/variable'],
+            ['Reference above root group', '../../var', '/group', '/var'],
         ]
 
         for description, reference, group_path, abs_reference in test_args:
@@ -341,6 +388,7 @@ class TestUtilities(TestCase):
             ['Non existant nested variable', '/group/missing', False],
             ['Non existant group', '/group_three/variable', False],
             ['Over nested variable', '/group/group_two/group_three/var', False],
+            ['Group, not variable', '/group/group_two', False],
         ]
 
         for description, variable_name, expected_result in test_args:
@@ -413,6 +461,21 @@ class TestTransposeIfXdimLessThanYdim(TestCase):
         np.testing.assert_array_equal(result, expected_output)
         np.testing.assert_array_equal(result.mask, expected_output.mask)
 
+    def test_unmasked_array(self):
+        """Test case with a plain array, which should not gain a mask."""
+        input_array = np.array([[1, 2, 3], [4, 5, 6]])
+        result = transpose_if_xdim_less_than_ydim(input_array)
+        self.assertNotIsInstance(result, np.ma.MaskedArray)
+        self.assertTrue(result.flags['C_CONTIGUOUS'])
+        np.testing.assert_array_equal(result, np.array([[1, 4], [2, 5], [3, 6]]))
+
+    def test_no_copy(self):
+        """Test case where a transposed view of the input is requested."""
+        input_array = np.array([[1, 2, 3], [4, 5, 6]])
+        result = transpose_if_xdim_less_than_ydim(input_array, copy=False)
+        self.assertTrue(np.shares_memory(result, input_array))
+        np.testing.assert_array_equal(result, np.array([[1, 4], [2, 5], [3, 6]]))
+
 
 class TestGetRowsPerScan(TestCase):
     def test_number_less_than_2(self):
@@ -426,3 +489,49 @@ class TestGetRowsPerScan(TestCase):
 
     def test_prime_number(self):
         self.assertEqual(get_rows_per_scan(3), 3)
+
+    def test_square_of_prime(self):
+        self.assertEqual(get_rows_per_scan(49), 7)
+
+    def test_large_prime_number(self):
+        self.assertEqual(get_rows_per_scan(8_000_009), 8_000_009)
+
+
+class TestGetChunkSizes(TestCase):
+    def test_two_dimensional(self):
+        """Chunks should span full rows, with as many rows as fit in 1 MiB."""
+        self.assertTupleEqual(
+            get_chunk_sizes((4000, 1024), np.dtype('float32')), (256, 1024)
+        )
+
+    def test_small_array(self):
+        """Chunks should not be larger than the array itself."""
+        self.assertTupleEqual(get_chunk_sizes((10, 20), np.dtype('float64')), (10, 20))
+
+    def test_large_row(self):
+        """A row larger than the target chunk size should be a single chunk."""
+        self.assertTupleEqual(
+            get_chunk_sizes((10, 500000), np.dtype('float64')), (1, 500000)
+        )
+
+    def test_leading_dimension(self):
+        """Leading dimensions, e.g. time, should have a chunk size of 1."""
+        self.assertTupleEqual(
+            get_chunk_sizes((3, 100, 200), np.dtype('int16')), (1, 100, 200)
+        )
+
+    def test_one_dimensional(self):
+        """One dimensional arrays should be chunked by number of elements."""
+        self.assertTupleEqual(get_chunk_sizes((10,), np.dtype('int8')), (10,))
+        self.assertTupleEqual(
+            get_chunk_sizes((1000000,), np.dtype('float64')), (131072,)
+        )
+
+    def test_default_chunking(self):
+        """Scalars, empty dimensions and variable length types should use the
+        default `netCDF4` chunking.
+
+        """
+        self.assertIsNone(get_chunk_sizes((), np.dtype('S1')))
+        self.assertIsNone(get_chunk_sizes((0, 10), np.dtype('float32')))
+        self.assertIsNone(get_chunk_sizes((10,), str))